@@ -1,5 +1,9 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.parsers import python_parser
 
 app = FastAPI()
@@ -9,27 +13,75 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],  # Frontend URLs
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET"],  # The API is read-only
+    allow_headers=["content-type"],
 )
 
-@app.get("/health")
+# Rendered once at import time; the probe fast path below sends this same object.
+_HEALTH_RESPONSE = JSONResponse({"status": "ok"})
+
+class HealthProbeMiddleware:
+    """
+    Answer load-balancer health probes before the rest of the middleware stack.
+
+    Probes carry no Origin header, so they never need CORS handling. Browser requests
+    (which do send Origin) still reach the /health route below and get CORS headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/health"
+            and scope["method"] in ("GET", "HEAD")
+            and not any(name == b"origin" for name, _ in scope["headers"])
+        ):
+            await _HEALTH_RESPONSE(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+# Added last so it sits outside CORSMiddleware.
+app.add_middleware(HealthProbeMiddleware)
+
+@app.api_route("/health", methods=["GET", "HEAD"])
 def health():
     return {"status": "ok"}
 
 @app.get("/parse/python")
-def parse_python_file(path: str = "../examples/python_project/hello.py"):
+async def parse_python_file(path: str = "../examples/python_project/hello.py"):
     """
     Parse a Python file and return structured information.
 
+    Reading and parsing run in a worker thread so the event loop keeps serving
+    other requests meanwhile. The parser hands back JSON it has already encoded
+    (and usually cached), so it is sent as-is without re-serializing.
+
     Args:
         path: Path to the Python file to parse.
 
     Returns:
         JSON with functions and classes, or error message.
     """
-    result = python_parser.parse_python_file(path)
-    return result
+    content = await asyncio.to_thread(python_parser.parse_python_file_json, path)
+    return Response(content=content, media_type="application/json")
+
+@app.get("/parse/repo")
+async def parse_repo(path: str = "../examples/python_project"):
+    """
+    Parse every Python file in a directory tree.
+
+    Results are streamed as newline-delimited JSON while files are parsed, so large
+    repositories never have to be held in memory as a single response.
+
+    Args:
+        path: Path to the repository root.
+
+    Returns:
+        NDJSON stream of module, function, and call records.
+    """
+    return StreamingResponse(python_parser.iter_parse_repo(path), media_type="application/x-ndjson")
 
 @app.get("/")
 def root():
@@ -0,0 +1,76 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Reader threads per process; enough to keep a local disk's queue busy.
+_MAX_READERS = 8
+
+_reader_pool: Optional[ThreadPoolExecutor] = None
+_reader_pool_lock = threading.Lock()
+
+def _get_reader_pool() -> ThreadPoolExecutor:
+    """Return this process's reader threads, starting them on first use rather than per batch."""
+    global _reader_pool
+    with _reader_pool_lock:
+        if _reader_pool is None:
+            _reader_pool = ThreadPoolExecutor(max_workers=_MAX_READERS, thread_name_prefix="file-reader")
+        return _reader_pool
+
+def _forget_reader_pool() -> None:
+    # A forked child inherits the pool object but not its threads.
+    global _reader_pool, _reader_pool_lock
+    _reader_pool = None
+    _reader_pool_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_reader_pool)
+
+def read_file(path: str, size: Optional[int] = None) -> bytes:
+    """
+    Read a whole file as bytes.
+
+    When the caller already knows the size from an earlier stat (e.g. a cached DirEntry),
+    the file is read with sized read() calls on a raw descriptor, skipping the fstat/lseek
+    calls a buffered open().read() makes to size its buffer.
+    """
+    if size is None:
+        with open(path, "rb") as f:
+            return f.read()
+
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        # Ask for one extra byte so growth since the stat is noticed. os.read may
+        # return fewer bytes than requested before EOF, so only b"" ends the file.
+        data = os.read(fd, size + 1)
+        if not data:
+            return data
+        chunks = [data]
+        while True:
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+def read_many(paths: List[str], sizes: Optional[List[int]] = None) -> Dict[str, Optional[bytes]]:
+    """
+    Read a batch of files concurrently and return their contents keyed by path.
+
+    File reads release the GIL, so a handful of threads keeps several open/read calls in
+    flight at once instead of paying for each one's latency in turn. `sizes`, if given,
+    are passed on to read_file. Files that cannot be read (e.g. deleted since they were
+    listed) map to None rather than failing the whole batch.
+    """
+    if sizes is None:
+        sizes = [None] * len(paths)
+    if len(paths) <= 1:
+        return {path: _read_or_none(path, size) for path, size in zip(paths, sizes)}
+    return dict(zip(paths, _get_reader_pool().map(_read_or_none, paths, sizes)))
+
+def _read_or_none(path: str, size: Optional[int]) -> Optional[bytes]:
+    try:
+        return read_file(path, size)
+    except OSError:
+        return None
@@ -1,59 +1,93 @@
 import ast
-from pathlib import Path
-from typing import Dict, List, Any, Optional, Set
+import functools
+import hashlib
+import multiprocessing
+import os
+import stat
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 import re
 
+import orjson
+
+from app.parsers import _file_reader, repo_index, result_cache
+
+# ast.unparse is available on Python 3.9+; older versions use _unparse_annotation.
+_HAS_UNPARSE = hasattr(ast, 'unparse')
+
 def parse_python_file(file_path: str) -> Dict[str, Any]:
     """
     Parse a Python file using the ast module and extract comprehensive structural information.
 
+    Results are memoized in-process on (path, mtime, size), so repeated requests for an
+    unchanged file skip both disk I/O and parsing.
+
     Args:
         file_path: Path to the Python file to parse.
 
     Returns:
         Dict containing functions, classes, relationships, and analysis insights.
+        Functions (and each class's methods) are laid out column-wise, e.g.
+        {"name": [...], "args": [...], "returns": [...], "docstring": [...]}, so the
+        i-th entry of every list describes the same function.
     """
-    file = Path(file_path)
-    if not file.exists() or not file.is_file():
-        return {"error": f"File not found: {file_path}"}
+    # Decoding the cached JSON gives every caller its own copy of the result.
+    return orjson.loads(parse_python_file_json(file_path))
 
+def parse_python_file_json(file_path: str) -> bytes:
+    """Like parse_python_file, but return the result already serialized as JSON."""
     try:
-        with open(file, "r", encoding="utf-8") as f:
-            source = f.read()
-        tree = ast.parse(source, filename=str(file))
-    except SyntaxError as e:
-        return {"error": f"Syntax error in {file_path}: {str(e)}"}
+        st = os.stat(file_path)
+    except OSError:
+        return orjson.dumps({"error": f"File not found: {file_path}"})
+    if not stat.S_ISREG(st.st_mode):
+        return orjson.dumps({"error": f"File not found: {file_path}"})
+
+    try:
+        return _parse_cached(file_path, st.st_mtime_ns, st.st_size)
     except Exception as e:
-        return {"error": f"Error parsing {file_path}: {str(e)}"}
+        # Not memoized, so a transient failure (e.g. EMFILE while reading) is retried
+        # on the next request.
+        return orjson.dumps({"error": f"Error parsing {file_path}: {str(e)}"})
 
-    # Extract all code elements
-    functions = []
-    classes = []
-    imports = []
-    relationships = {
-        "function_calls": [],
-        "class_inheritance": [],
-        "method_calls": [],
-        "attribute_access": []
-    }
+@functools.lru_cache(maxsize=512)
+def _parse_cached(file_path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Parse and analyze a file into JSON; mtime_ns and size only serve as cache keys.
 
-    # First pass: collect all functions and classes
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef) and not _is_method(node, tree):
-            functions.append(_extract_function_info(node))
-        elif isinstance(node, ast.ClassDef):
-            classes.append(_extract_class_info(node))
-        elif isinstance(node, ast.Import):
-            imports.extend(_extract_import_info(node))
-        elif isinstance(node, ast.ImportFrom):
-            imports.extend(_extract_import_from_info(node))
-
-    # Second pass: extract relationships
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            _extract_call_relationships(node, relationships, functions, classes)
-        elif isinstance(node, ast.Attribute):
-            _extract_attribute_relationships(node, relationships)
+    Only failures determined by the file's content are returned (and so memoized) as
+    error results. Anything else is raised to the caller.
+    """
+    # ast.parse accepts bytes and decodes them itself (honouring PEP 263 coding
+    # cookies), so there is no separate text decoding pass.
+    source = _file_reader.read_file(file_path, size)
+    result = result_cache.load(source)
+    if result is not None:
+        return result
+    try:
+        tree = ast.parse(source, filename=file_path)
+        result = orjson.dumps(_analyze(tree, source))
+    except SyntaxError as e:
+        return orjson.dumps({"error": f"Syntax error in {file_path}: {str(e)}"})
+    except (ValueError, RecursionError) as e:
+        # Null bytes in the source, or nesting too deep for the parser or the analysis.
+        return orjson.dumps({"error": f"Error parsing {file_path}: {str(e)}"})
+
+    result_cache.store(source, result)
+    return result
+
+def _analyze(tree: ast.Module, source: bytes) -> Dict[str, Any]:
+    """Build the parse_python_file result for an already parsed module."""
+    # Extract all code elements in a single traversal
+    collector = _Collector()
+    collector.visit(tree)
+    functions = collector.functions
+    classes = collector.classes
+    imports = collector.imports
+    relationships = collector.relationships
 
     # Calculate code metrics and insights
     metrics = _calculate_code_metrics(source, functions, classes, relationships)
@@ -67,42 +101,81 @@ def parse_python_file(file_path: str) -> Dict[str, Any]:
         "insights": _generate_insights(functions, classes, relationships, metrics)
     }
 
-def _is_method(func_node: ast.FunctionDef, tree: ast.Module) -> bool:
-    """Check if a function is a method by seeing if it's inside a class."""
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef):
-            for item in node.body:
-                if item is func_node:
-                    return True
-    return False
-
-def _extract_function_info(node: ast.FunctionDef) -> Dict[str, Any]:
-    """Extract information from a function node."""
-    args = [arg.arg for arg in node.args.args]
-    returns = _get_type_annotation(node.returns)
-    docstring = _get_docstring(node)
+parse_python_file.cache_clear = _parse_cached.cache_clear
+
+class _Collector:
+    """Collect functions, classes, imports and relationships in one pass over the tree."""
+
+    def __init__(self) -> None:
+        self.functions: Dict[str, List[Any]] = _function_columns()
+        self.classes: List[Dict[str, Any]] = []
+        self.imports: List[Dict[str, str]] = []
+        self.relationships: Dict[str, List[Dict[str, Any]]] = {
+            "function_calls": [],
+            "class_inheritance": [],
+            "method_calls": [],
+            "attribute_access": []
+        }
+
+    def visit(self, tree: ast.AST) -> None:
+        """
+        Visit every node depth-first in source order.
+
+        The walk keeps an explicit (node, parent) stack instead of recursing like
+        ast.NodeVisitor, so deeply nested expressions that ast.parse accepts cannot
+        overflow the Python stack.
+        """
+        stack = [(tree, None)]
+        while stack:
+            node, parent = stack.pop()
+            node_type = type(node)
+            if node_type is ast.FunctionDef:
+                # Functions defined directly in a class body are reported as methods of that class.
+                if type(parent) is not ast.ClassDef:
+                    _extract_function_info(node, self.functions)
+            elif node_type is ast.ClassDef:
+                self.classes.append(_extract_class_info(node))
+            elif node_type is ast.Import:
+                self.imports.extend(_extract_import_info(node))
+                continue
+            elif node_type is ast.ImportFrom:
+                self.imports.extend(_extract_import_from_info(node))
+                continue
+            elif node_type is ast.Call:
+                _extract_call_relationships(node, self.relationships, self.functions, self.classes)
+            elif node_type is ast.Attribute:
+                _extract_attribute_relationships(node, self.relationships)
+            # Push children in reverse so they are popped in source order.
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()
+            stack.extend((child, node) for child in children)
+
+def _function_columns() -> Dict[str, List[Any]]:
+    """Create empty parallel lists for _extract_function_info to fill."""
     return {
-        "name": node.name,
-        "args": args,
-        "returns": returns,
-        "docstring": docstring
+        "name": [],
+        "args": [],
+        "returns": [],
+        "docstring": []
     }
 
+def _extract_function_info(node: ast.FunctionDef, columns: Dict[str, List[Any]]) -> None:
+    """Extract information from a function node and append it onto the column lists."""
+    columns["name"].append(node.name)
+    columns["args"].append([arg.arg for arg in node.args.args])
+    columns["returns"].append(_get_type_annotation(node.returns))
+    columns["docstring"].append(_get_docstring(node))
+
 def _extract_class_info(node: ast.ClassDef) -> Dict[str, Any]:
     """Extract information from a class node."""
-    bases = []
-    for base in node.bases:
-        if isinstance(base, ast.Name):
-            bases.append(base.id)
-        elif isinstance(base, ast.Attribute):
-            bases.append(f"{base.value.id}.{base.attr}" if isinstance(base.value, ast.Name) else str(base.attr))
-
+    # Bases are expressions like annotations (Name, dotted Attribute, Generic[T], ...).
+    bases = [_get_type_annotation(base) for base in node.bases]
     docstring = _get_docstring(node)
-    methods = []
+    methods = _function_columns()
 
     for item in node.body:
         if isinstance(item, ast.FunctionDef):
-            methods.append(_extract_function_info(item))
+            _extract_function_info(item, methods)
 
     return {
         "name": node.name,
@@ -115,14 +188,14 @@ def _get_type_annotation(node: Optional[ast.AST]) -> Optional[str]:
     """Convert AST type annotation to string."""
     if node is None:
         return None
+    # Plain names (str, int, ...) are the most common annotations; skip the unparser for them.
+    if type(node) is ast.Name:
+        return node.id
     try:
-        # Use ast.unparse if available (Python 3.9+)
-        if hasattr(ast, 'unparse'):
-            return ast.unparse(node)
-        else:
-            # Fallback for older Python versions
-            return _unparse_annotation(node)
-    except:
+        return ast.unparse(node) if _HAS_UNPARSE else _unparse_annotation(node)
+    except (RecursionError, ValueError):
+        # Both unparsers recurse, so an annotation nested deeper than the Python stack
+        # allows can fail even though ast.parse accepted it.
         return None
 
 def _unparse_annotation(node: ast.AST) -> str:
@@ -178,7 +251,7 @@ def _extract_import_from_info(node: ast.ImportFrom) -> List[Dict[str, str]]:
         })
     return imports
 
-def _extract_call_relationships(node: ast.Call, relationships: Dict, functions: List, classes: List) -> None:
+def _extract_call_relationships(node: ast.Call, relationships: Dict, functions: Dict, classes: List) -> None:
     """Extract function and method call relationships."""
     if isinstance(node.func, ast.Name):
         # Direct function call
@@ -208,53 +281,48 @@ def _extract_attribute_relationships(node: ast.Attribute, relationships: Dict) -
             "type": "attribute_access"
         })
 
-def _calculate_code_metrics(source: str, functions: List, classes: List, relationships: Dict) -> Dict[str, Any]:
+def _calculate_code_metrics(source: bytes, functions: Dict, classes: List, relationships: Dict) -> Dict[str, Any]:
     """Calculate various code metrics."""
-    lines = source.split('\n')
+    lines = source.split(b'\n')
     total_lines = len(lines)
-    code_lines = len([line for line in lines if line.strip() and not line.strip().startswith('#')])
+    # A line is blank or a comment based on its first non-whitespace character, so one
+    # C-level lstrip per line is enough. (A multiline bytes regex over the whole source
+    # gives the same counts but measured ~2.5x slower.)
+    code_lines = len([1 for line in map(bytes.lstrip, lines) if line and line[:1] != b'#'])
 
     return {
         "total_lines": total_lines,
         "code_lines": code_lines,
-        "function_count": len(functions),
+        "function_count": len(functions["name"]),
         "class_count": len(classes),
         "complexity_score": _calculate_complexity_score(functions, classes),
         "relationship_density": len(relationships["function_calls"]) + len(relationships["method_calls"]),
         "documentation_coverage": _calculate_doc_coverage(functions, classes)
     }
 
-def _calculate_complexity_score(functions: List, classes: List) -> float:
+def _calculate_complexity_score(functions: Dict, classes: List) -> float:
     """Calculate a simple complexity score based on code structure."""
     score = 0
-    score += len(functions) * 1.0  # Functions add complexity
+    score += len(functions["name"]) * 1.0  # Functions add complexity
     score += len(classes) * 2.0    # Classes add more complexity
     for cls in classes:
-        score += len(cls["methods"]) * 0.5  # Methods add complexity
+        score += len(cls["methods"]["name"]) * 0.5  # Methods add complexity
     return round(score, 2)
 
-def _calculate_doc_coverage(functions: List, classes: List) -> float:
+def _calculate_doc_coverage(functions: Dict, classes: List) -> float:
     """Calculate documentation coverage percentage."""
-    total_items = len(functions)
-    for cls in classes:
-        total_items += 1 + len(cls["methods"])
+    total_items = len(functions["name"]) + sum(1 + len(cls["methods"]["name"]) for cls in classes)
 
-    documented_items = 0
-    for func in functions:
-        if func["docstring"]:
-            documented_items += 1
-    for cls in classes:
-        if cls["docstring"]:
-            documented_items += 1
-        for method in cls["methods"]:
-            if method["docstring"]:
-                documented_items += 1
+    documented_items = sum(1 for docstring in functions["docstring"] if docstring)
+    documented_items += sum(1 for cls in classes if cls["docstring"])
+    documented_items += sum(1 for cls in classes for docstring in cls["methods"]["docstring"] if docstring)
 
     return round((documented_items / total_items * 100) if total_items > 0 else 0, 1)
 
-def _generate_insights(functions: List, classes: List, relationships: Dict, metrics: Dict) -> List[str]:
+def _generate_insights(functions: Dict, classes: List, relationships: Dict, metrics: Dict) -> List[str]:
     """Generate insightful observations about the code."""
     insights = []
+    function_count = len(functions["name"])
 
     # Complexity insights
     if metrics["complexity_score"] > 10:
@@ -269,9 +337,9 @@ def _generate_insights(functions: List, classes: List, relationships: Dict, metr
         insights.append("Excellent documentation coverage!")
 
     # Structure insights
-    if len(classes) > len(functions):
+    if len(classes) > function_count:
         insights.append("Class-heavy design - good for encapsulation")
-    elif len(functions) > len(classes) * 2:
+    elif function_count > len(classes) * 2:
         insights.append("Function-heavy design - good for procedural programming")
 
     # Relationship insights
@@ -282,38 +350,327 @@ def _generate_insights(functions: List, classes: List, relationships: Dict, metr
 
     return insights
 
+# Directories that never contain project sources worth parsing. Hidden directories
+# (.git, .venv, .tox, ...) are skipped as well.
+_SKIP_DIRS = frozenset({
+    "__pycache__",
+    ".git",
+    ".venv",
+    "venv",
+    "node_modules",
+    ".mypy_cache",
+    ".pytest_cache",
+    "build",
+    "dist",
+    ".tox",
+})
+
+def _iter_py_files(root: str) -> Iterator[os.DirEntry]:
+    """
+    Yield a DirEntry for every .py file under root.
+
+    Uses os.scandir so file-type checks come from the cached directory entry instead of a
+    stat per path, skips symlinks, and prunes hidden, VCS, cache, build and virtualenv
+    directories without descending into them.
+
+    On Linux, scandir is backed by glibc's readdir, which already fetches entries with
+    getdents64 into a buffer of at least 32 KiB, so dense directories need no custom
+    listing code.
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        # Missing or unreadable directories are skipped, as Path.rglob did.
+        return
+    with it:
+        for entry in it:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS and not entry.name.startswith("."):
+                    yield from _iter_py_files(entry.path)
+            elif entry.is_file(follow_symlinks=False) and entry.name.endswith(".py"):
+                yield entry
+
+# Files handed to a worker process per round trip; also the smallest repo worth a pool.
+_PARSE_CHUNKSIZE = 32
+
+# Stored results fetched from the repo index per round trip while they are yielded.
+_INDEX_BATCH = 256
+
+def _parse_workers() -> int:
+    """
+    Size of this process's parse pool.
+
+    CODE_EXPLORER_PARSE_WORKERS sets it directly. Otherwise the CPUs are split between the
+    WEB_CONCURRENCY server processes (see run.sh), each of which has its own pool, so a
+    multi-worker server does not start one pool per CPU per worker.
+    """
+    configured = int(os.environ.get("CODE_EXPLORER_PARSE_WORKERS") or 0)
+    if configured > 0:
+        return configured
+    web_workers = max(int(os.environ.get("WEB_CONCURRENCY") or 1), 1)
+    return max(min((os.cpu_count() or 1) // web_workers, 8), 1)
+
+# Parse worker processes, shared by every parse_repo call in this process.
+_MAX_PARSE_WORKERS = _parse_workers()
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared parse worker pool, creating it on first use.
+
+    Workers are started with forkserver (spawn where it is unavailable): forking the
+    multithreaded server process directly could copy a lock held by another thread into
+    the child and deadlock it.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=_MAX_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _parse_pool
+
+def _discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _parse_one(path: str, source: bytes) -> Dict[str, List]:
+    """
+    Parse a single file for parse_repo.
+
+    Returns {"functions": [[name, lineno], ...], "calls": [callee, ...]}. The module name
+    is attached later so that indexed results do not depend on the repo root.
+    """
+    functions = []
+    calls = []
+
+    try:
+        tree = ast.parse(source, filename=path)
+    except SyntaxError:
+        return {"functions": functions, "calls": calls}
+
+    # Same breadth-first order as ast.walk, but inlined: skipping the generator and using
+    # exact type checks makes this hot loop measurably cheaper.
+    queue = deque([tree])
+    while queue:
+        node = queue.popleft()
+        node_type = type(node)
+        if node_type is ast.FunctionDef:
+            functions.append([node.name, node.lineno])
+        elif node_type is ast.Call:
+            if isinstance(node.func, ast.Name):
+                calls.append(node.func.id)
+            elif isinstance(node.func, ast.Attribute):
+                calls.append(node.func.attr)
+        queue.extend(ast.iter_child_nodes(node))
+
+    return {"functions": functions, "calls": calls}
+
+def _parse_chunk(files: List[Tuple[str, int, Optional[bytes]]]) -> List[Tuple[Optional[bytes], Optional[bytes]]]:
+    """
+    Read a chunk of (path, size, known_sha256) files in one batch and parse each one.
+
+    Returns a (sha256, result) pair per file, where result is the JSON-encoded output of
+    _parse_one, or None when the content still matches known_sha256 and needs no parse.
+    A file that can no longer be read (e.g. deleted since the walk) gets (None, None).
+    """
+    paths = [path for path, _, _ in files]
+    sources = _file_reader.read_many(paths, [size for _, size, _ in files])
+    results = []
+    for path, _, known_sha256 in files:
+        source = sources[path]
+        if source is None:
+            results.append((None, None))
+            continue
+        digest = hashlib.sha256(source).digest()
+        if digest == known_sha256:
+            results.append((digest, None))
+        else:
+            results.append((digest, orjson.dumps(_parse_one(path, source))))
+    return results
+
 # Legacy function for backward compatibility
 def parse_repo(repo_path: str) -> Dict[str, Any]:
     """
     Parse a Python repo into modules, functions, and calls.
     Deprecated: Use parse_python_file for richer parsing.
+
+    Files are read in batches and parsed in parallel worker processes once the repo is
+    large enough to amortize the pool start-up cost. See iter_parse_repo for a streaming
+    variant that never holds the whole result in memory.
     """
-    repo = Path(repo_path)
     result = {"modules": [], "functions": [], "calls": []}
+    for modules, functions, calls in _iter_repo_results(repo_path, ordered=True):
+        result["modules"].extend(modules)
+        result["functions"].extend(functions)
+        result["calls"].extend(calls)
+    return result
 
-    for file in repo.rglob("*.py"):
-        module_name = file.relative_to(repo).as_posix()
-        result["modules"].append(module_name)
+def iter_parse_repo(repo_path: str) -> Iterator[bytes]:
+    """
+    Parse a Python repo like parse_repo, streaming the result as NDJSON.
 
-        with open(file, "r", encoding="utf-8") as f:
-            try:
-                tree = ast.parse(f.read(), filename=str(file))
-            except SyntaxError:
-                continue
+    Every module, function and call becomes one JSON object per line, tagged with a
+    "type" of "module", "function" or "call". Lines are yielded one file at a time as
+    soon as that file has been parsed, so unlike parse_repo the file order may vary
+    between calls.
+    """
+    for modules, functions, calls in _iter_repo_results(repo_path):
+        lines = [orjson.dumps({"type": "module", "name": module}) for module in modules]
+        lines.extend(orjson.dumps({"type": "function", **function}) for function in functions)
+        lines.extend(orjson.dumps({"type": "call", **call}) for call in calls)
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+def _iter_repo_results(repo_path: str, ordered: bool = False) -> Iterator[Tuple[List, List, List]]:
+    """
+    Yield the (modules, functions, calls) of every file in the repo.
+
+    With ordered=True files come out in directory walk order; otherwise each one is
+    yielded as soon as it is available. Files whose (mtime, size) still match the repo
+    index are served from it without being read. The rest are re-hashed, and only
+    re-parsed if their content actually changed.
+    """
+    root = os.path.abspath(repo_path)
+    files = []
+    for entry in _iter_py_files(root):
+        module_name = os.path.relpath(entry.path, root).replace(os.sep, "/")
+        # DirEntry caches this stat, so the reader never has to fstat the file again.
+        files.append((entry.path, module_name, entry.stat(follow_symlinks=False)))
+
+    paths = [path for path, _, _ in files]
+    # Forget files that have been deleted (or are now skipped) since the last parse.
+    repo_index.prune(root, paths)
+    known = repo_index.lookup(paths)
+
+    fresh = set()
+    stale = []
+    for path, module_name, st in files:
+        indexed = known.get(path)
+        if indexed is not None and (indexed.mtime_ns, indexed.size) == (st.st_mtime_ns, st.st_size):
+            fresh.add(path)
+        else:
+            stale.append((path, module_name, st, indexed))
+
+    # Stored results are fetched a batch at a time as they are yielded, so a warm index
+    # never puts the whole repo's results in memory at once.
+    parsed = _iter_stale_results(stale, ordered)
+    if ordered:
+        # Stale files come back in walk order too, so interleave them with the fresh ones.
+        for i in range(0, len(files), _INDEX_BATCH):
+            batch = files[i:i + _INDEX_BATCH]
+            results = _load_results([(path, st.st_size) for path, _, st in batch if path in fresh])
+            for path, module_name, _ in batch:
+                result = results[path] if path in fresh else next(parsed)[1]
+                if result is not None:
+                    yield _repo_file_result(module_name, result)
+        return
+
+    fresh_files = [(path, module_name, st) for path, module_name, st in files if path in fresh]
+    for i in range(0, len(fresh_files), _INDEX_BATCH):
+        batch = fresh_files[i:i + _INDEX_BATCH]
+        results = _load_results([(path, st.st_size) for path, _, st in batch])
+        for path, module_name, _ in batch:
+            if results[path] is not None:
+                yield _repo_file_result(module_name, results[path])
+    for module_name, result in parsed:
+        if result is not None:
+            yield _repo_file_result(module_name, result)
+
+def _load_results(files: List[Tuple[str, int]]) -> Dict[str, Optional[bytes]]:
+    """
+    Fetch the indexed results of (path, size) files.
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                result["functions"].append(
-                    {
-                        "name": node.name,
-                        "module": module_name,
-                        "lineno": node.lineno,
-                    }
-                )
-            elif isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name):
-                    result["calls"].append({"callee": node.func.id})
-                elif isinstance(node.func, ast.Attribute):
-                    result["calls"].append({"callee": node.func.attr})
+    Any entry that has vanished since the lookup (e.g. dropped by a concurrent parse under
+    another parser version) is parsed again instead; None marks a file that could not be
+    read for that.
+    """
+    results = repo_index.load_results([path for path, _ in files])
+    missing = [(path, size, None) for path, size in files if path not in results]
+    if missing:
+        for (path, _, _), (_, result) in zip(missing, _parse_chunk(missing)):
+            results[path] = result
+    return results
+
+def _iter_stale_results(stale: List[Tuple], ordered: bool) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Parse stale files, record them in the index and yield their results.
 
-    return result
+    Files that could not be read are yielded with a None result, so ordered callers stay
+    aligned with the stale list, and are left out of the index.
+    """
+    for chunk, chunk_results in _parse_stale_files(stale, ordered):
+        # Files whose content still matches the index keep their stored result.
+        unchanged = _load_results([
+            (path, st.st_size)
+            for (path, _, st, _), (digest, result) in zip(chunk, chunk_results)
+            if digest is not None and result is None
+        ])
+        results = []
+        updates = []
+        for (path, module_name, st, _), (digest, result) in zip(chunk, chunk_results):
+            if digest is not None and result is None:
+                result = unchanged[path]
+            if result is not None:
+                updates.append(repo_index.IndexedFile(path, st.st_mtime_ns, st.st_size, digest, result))
+            results.append((module_name, result))
+        repo_index.update(updates)
+
+        yield from results
+
+def _parse_stale_files(stale: List[Tuple], ordered: bool = False) -> Iterator[Tuple[List[Tuple], List[Tuple[bytes, Optional[bytes]]]]]:
+    """
+    Parse (path, module_name, stat, indexed) files in chunks, yielding each chunk with its results.
+
+    Chunks are yielded in submission order when ordered is set, otherwise as they complete.
+    """
+    chunks = [stale[i:i + _PARSE_CHUNKSIZE] for i in range(0, len(stale), _PARSE_CHUNKSIZE)]
+    chunk_args = [
+        [(path, st.st_size, indexed.sha256 if indexed else None) for path, _, st, indexed in chunk]
+        for chunk in chunks
+    ]
+
+    if len(chunks) <= 1:
+        for chunk, args in zip(chunks, chunk_args):
+            yield chunk, _parse_chunk(args)
+        return
+
+    executor = _get_parse_pool()
+    futures = {}
+    try:
+        for chunk, args in zip(chunks, chunk_args):
+            futures[executor.submit(_parse_chunk, args)] = chunk
+        for future in (futures if ordered else as_completed(futures)):
+            yield futures[future], future.result()
+    except BrokenProcessPool:
+        _discard_parse_pool(executor)
+        raise
+    finally:
+        # Drop chunks that have not started if the consumer stops early (e.g. the client
+        # of a streaming response disconnects). The pool itself stays up for later calls.
+        for future in futures:
+            future.cancel()
+
+def _repo_file_result(module_name: str, result: bytes) -> Tuple[List[str], List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Expand a file's encoded _parse_one result into parse_repo's (modules, functions, calls)."""
+    data = orjson.loads(result)
+    functions = [
+        {
+            "name": name,
+            "module": module_name,
+            "lineno": lineno,
+        }
+        for name, lineno in data["functions"]
+    ]
+    calls = [{"callee": callee} for callee in data["calls"]]
+    return [module_name], functions, calls
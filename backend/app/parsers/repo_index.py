@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.parsers import result_cache
+
+INDEX_PATH = result_cache.CACHE_ROOT / "repo_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 BLOB NOT NULL,
+    result BLOB NOT NULL
+)
+"""
+
+# Stored as the database's user_version. Results recorded by another parser version or
+# Python minor release (whose ast.parse may accept different syntax) are discarded.
+_INDEX_VERSION = result_cache.PARSER_VERSION * 10000 + sys.version_info[0] * 100 + sys.version_info[1]
+
+# SQLite caps the number of bound parameters per statement; stay well below it.
+_LOOKUP_BATCH = 500
+
+class IndexedFile(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: bytes
+    result: bytes
+
+class IndexedStat(NamedTuple):
+    mtime_ns: int
+    size: int
+    sha256: bytes
+
+# Persistent per-file parse results for parse_repo, keyed by absolute path.
+#
+# Like the result cache, the index is best-effort: if the database cannot be opened or
+# written, lookups simply miss and updates are dropped. Every call opens and closes its
+# own connection, because parse_repo's generators may be resumed on a different thread
+# each time (e.g. under a StreamingResponse) and sqlite3 connections are bound to the
+# thread that created them.
+
+def _connect() -> Optional[sqlite3.Connection]:
+    try:
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(INDEX_PATH, timeout=30)
+    except (OSError, sqlite3.Error):
+        return None
+    try:
+        # WAL lets concurrent server workers read while another one writes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _INDEX_VERSION:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+        conn.execute(_SCHEMA)
+    except sqlite3.Error:
+        conn.close()
+        return None
+    return conn
+
+def lookup(paths: List[str]) -> Dict[str, IndexedStat]:
+    """
+    Return the indexed (mtime_ns, size, sha256) for whichever of `paths` are present.
+
+    Results are left in the database; fetch them with load_results when they are needed.
+    """
+    return {
+        row[0]: IndexedStat(*row[1:])
+        for row in _select("SELECT path, mtime_ns, size, sha256 FROM files WHERE path IN ({})", paths)
+    }
+
+def load_results(paths: List[str]) -> Dict[str, bytes]:
+    """Return the stored results for whichever of `paths` are present."""
+    return dict(_select("SELECT path, result FROM files WHERE path IN ({})", paths))
+
+def _select(query: str, paths: List[str]) -> List[tuple]:
+    """Run `query` with its IN list filled from `paths` in batches; [] if the index is unusable."""
+    if not paths:
+        return []
+    conn = _connect()
+    if conn is None:
+        return []
+    rows = []
+    try:
+        for i in range(0, len(paths), _LOOKUP_BATCH):
+            batch = paths[i:i + _LOOKUP_BATCH]
+            rows.extend(conn.execute(query.format(",".join("?" * len(batch))), batch))
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+    return rows
+
+def update(entries: Iterable[IndexedFile]) -> None:
+    """Insert or replace entries and commit them."""
+    conn = _connect()
+    if conn is None:
+        return
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, result) VALUES (?, ?, ?, ?, ?)",
+                entries,
+            )
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+def prune(root: str, paths: Iterable[str]) -> None:
+    """Delete entries under the directory `root` whose path is not among `paths`."""
+    conn = _connect()
+    if conn is None:
+        return
+    # Every path under root sorts between "root/" and "root0" ("0" follows os.sep).
+    prefix = root.rstrip(os.sep) + os.sep
+    upper = prefix[:-1] + chr(ord(os.sep) + 1)
+    keep = set(paths)
+    try:
+        rows = conn.execute("SELECT path FROM files WHERE path >= ? AND path < ?", (prefix, upper))
+        gone = [(path,) for path, in rows if path not in keep]
+        if gone:
+            with conn:
+                conn.executemany("DELETE FROM files WHERE path = ?", gone)
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
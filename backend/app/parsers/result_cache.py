@@ -0,0 +1,124 @@
+import hashlib
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+# Bump whenever the cached entry format or parse_python_file's output changes so stale
+# entries are ignored. The repo index is versioned by it too.
+PARSER_VERSION = 2
+
+# Root of the on-disk caches: parse results here, and the repo index. A relative path is
+# resolved against the server's working directory.
+CACHE_ROOT = Path(os.environ.get("CODE_EXPLORER_CACHE_DIR", ".cache"))
+CACHE_DIR = CACHE_ROOT / "results"
+
+# Total size result entries may take up before the least recently used ones are evicted.
+MAX_BYTES = int(os.environ.get("CODE_EXPLORER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Stores between eviction passes; the first store in each process also runs one.
+_PRUNE_INTERVAL = 100
+_stores = itertools.count()
+
+def cache_key(source: bytes) -> str:
+    """
+    Compute the cache key for a piece of Python source.
+
+    The key covers the raw source bytes, the running interpreter's major/minor
+    version (what ast.parse accepts and produces differs between releases) and
+    PARSER_VERSION.
+    """
+    preimage = f"{sys.version_info[0]}.{sys.version_info[1]}:{PARSER_VERSION}:".encode()
+    return hashlib.sha256(preimage + source).hexdigest()
+
+def _entry_path(source: bytes, suffix: str) -> Path:
+    return CACHE_DIR / f"{cache_key(source)}{suffix}"
+
+def _read(path: Path) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write(path: Path, data: bytes) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per writer: concurrent threads storing the same entry must
+        # not truncate each other's half-written file.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with open(fd, "wb") as f:
+            f.write(data)
+        # Atomic rename so concurrent readers never see a partial entry.
+        os.replace(tmp_name, path)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+
+def load(source: bytes) -> Optional[bytes]:
+    """Return the cached JSON-encoded parse result for `source`, or None on a cache miss."""
+    path = _entry_path(source, ".json")
+    data = _read(path)
+    if not data:
+        return None
+    try:
+        # Entries are only ever JSON objects; anything else was damaged on disk.
+        valid = isinstance(orjson.loads(data), dict)
+    except orjson.JSONDecodeError:
+        valid = False
+    if not valid:
+        return None
+    try:
+        # The mtime doubles as the last-use time that prune() evicts by.
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+def store(source: bytes, result: bytes) -> None:
+    """Persist the JSON-encoded parse result for `source`. Failures are ignored; caching is best-effort."""
+    _write(_entry_path(source, ".json"), result)
+    if next(_stores) % _PRUNE_INTERVAL == 0:
+        prune()
+
+def prune(max_bytes: Optional[int] = None) -> None:
+    """Evict the least recently used entries until the cache fits in max_bytes (default MAX_BYTES)."""
+    limit = MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+    except OSError:
+        return
+    if total <= limit:
+        return
+
+    # Go a little below the limit so the next few stores do not need another pass.
+    target = limit * 9 // 10
+    entries.sort()
+    for _, size, path in entries:
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
@@ -0,0 +1,20 @@
+#!/usr/bin/env sh
+# Production entry point for the API (use `uvicorn --reload` for development).
+# uvloop and httptools are installed by uvicorn[standard] in requirements.txt.
+set -eu
+cd "$(dirname "$0")"
+
+# Exported so each server worker can size its own parse_repo process pool to
+# CPUs / WEB_CONCURRENCY (override with CODE_EXPLORER_PARSE_WORKERS); otherwise
+# every worker would start a pool per CPU.
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-$(nproc 2>/dev/null || getconf _NPROCESSORS_ONLN)}"
+export WEB_CONCURRENCY
+
+exec uvicorn app.main:app \
+    --host "${HOST:-0.0.0.0}" \
+    --port "${PORT:-8000}" \
+    --workers "$WEB_CONCURRENCY" \
+    --loop uvloop \
+    --http httptools \
+    --limit-concurrency 1000 \
+    --timeout-keep-alive 30
@@ -0,0 +1,12 @@
+import pytest
+
+from app.parsers import python_parser, repo_index, result_cache
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path_factory, monkeypatch):
+    """Point the on-disk caches at a per-test directory and start with a cold LRU cache."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(result_cache, "CACHE_DIR", cache_dir / "results")
+    monkeypatch.setattr(repo_index, "INDEX_PATH", cache_dir / "repo_index.sqlite3")
+    python_parser.parse_python_file.cache_clear()
+    return cache_dir
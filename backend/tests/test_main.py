@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.parsers import python_parser, repo_index
+
+def test_parse_repo_endpoint_streams_and_indexes_concurrently(tmp_path: Path):
+    """Concurrent /parse/repo streams spanning several chunks all complete and fill the index."""
+    count = python_parser._PARSE_CHUNKSIZE * 2 + 1
+    for i in range(count):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    helper_{i}()\n")
+
+    def fetch(_):
+        with TestClient(app) as client:
+            response = client.get("/parse/repo", params={"path": str(tmp_path)})
+        assert response.status_code == 200
+        return [orjson.loads(line) for line in response.text.splitlines()]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(fetch, range(4)))
+
+    for records in responses:
+        modules = {r["name"] for r in records if r["type"] == "module"}
+        assert modules == {f"mod_{i}.py" for i in range(count)}
+    paths = [str(tmp_path / f"mod_{i}.py") for i in range(count)]
+    assert len(repo_index.lookup(paths)) == count
@@ -1,6 +1,10 @@
+from app.parsers import _file_reader, repo_index, result_cache
 from app.parsers import python_parser
+import os
 from pathlib import Path
 
+import orjson
+
 def test_parser_detects_functions_with_details():
     """Test detection of functions with arguments, return types, and docstrings."""
     file_path = "../examples/python_project/hello.py"
@@ -11,19 +15,19 @@ def test_parser_detects_functions_with_details():
     assert "error" not in result
 
     functions = result["functions"]
-    assert len(functions) == 2  # greet and add
+    assert len(functions["name"]) == 2  # greet and add
 
     # Check greet function
-    greet_func = next(f for f in functions if f["name"] == "greet")
-    assert greet_func["args"] == ["name"]
-    assert greet_func["returns"] == "str"
-    assert greet_func["docstring"] == "Greets the user by name."
+    greet = functions["name"].index("greet")
+    assert functions["args"][greet] == ["name"]
+    assert functions["returns"][greet] == "str"
+    assert functions["docstring"][greet] == "Greets the user by name."
 
     # Check add function
-    add_func = next(f for f in functions if f["name"] == "add")
-    assert add_func["args"] == ["a", "b"]
-    assert add_func["returns"] == "int"
-    assert add_func["docstring"] == "Adds two numbers."
+    add = functions["name"].index("add")
+    assert functions["args"][add] == ["a", "b"]
+    assert functions["returns"][add] == "int"
+    assert functions["docstring"][add] == "Adds two numbers."
 
 def test_parser_detects_classes_and_methods():
     """Test detection of classes with bases, docstrings, and methods."""
@@ -37,29 +41,31 @@ def test_parser_detects_classes_and_methods():
     greeter_class = next(c for c in classes if c["name"] == "Greeter")
     assert greeter_class["bases"] == []  # No explicit bases
     assert greeter_class["docstring"] == "Handles greeting operations."
-    assert len(greeter_class["methods"]) == 3  # __init__, say_hello, farewell
+    methods = greeter_class["methods"]
+    assert len(methods["name"]) == 3  # __init__, say_hello, farewell
 
     # Check __init__ method
-    init_method = next(m for m in greeter_class["methods"] if m["name"] == "__init__")
-    assert init_method["args"] == ["self", "default_name"]
-    assert init_method["returns"] is None
-    assert init_method["docstring"] == "Initialize with a default name."
+    init = methods["name"].index("__init__")
+    assert methods["args"][init] == ["self", "default_name"]
+    assert methods["returns"][init] is None
+    assert methods["docstring"][init] == "Initialize with a default name."
 
     # Check say_hello method
-    hello_method = next(m for m in greeter_class["methods"] if m["name"] == "say_hello")
-    assert hello_method["args"] == ["self", "name"]
-    assert hello_method["returns"] == "str"
-    assert hello_method["docstring"] == "Returns a hello message."
+    hello = methods["name"].index("say_hello")
+    assert methods["args"][hello] == ["self", "name"]
+    assert methods["returns"][hello] == "str"
+    assert methods["docstring"][hello] == "Returns a hello message."
 
     # Check Calculator class
     calc_class = next(c for c in classes if c["name"] == "Calculator")
     assert calc_class["docstring"] == "A simple calculator class."
-    assert len(calc_class["methods"]) == 2  # multiply, divide
+    methods = calc_class["methods"]
+    assert len(methods["name"]) == 2  # multiply, divide
 
-    multiply_method = next(m for m in calc_class["methods"] if m["name"] == "multiply")
-    assert multiply_method["args"] == ["self", "x", "y"]
-    assert multiply_method["returns"] == "float"
-    assert multiply_method["docstring"] == "Multiplies two numbers."
+    multiply = methods["name"].index("multiply")
+    assert methods["args"][multiply] == ["self", "x", "y"]
+    assert methods["returns"][multiply] == "float"
+    assert methods["docstring"][multiply] == "Multiplies two numbers."
 
 def test_parser_error_handling():
     """Test error handling for invalid files."""
@@ -77,3 +83,366 @@ def test_parser_detects_functions(tmp_path: Path):
 
     assert "hello.py" in result["modules"]
     assert any(f["name"] == "foo" for f in result["functions"])
+
+def test_parser_reuses_cached_result(tmp_path: Path, monkeypatch):
+    """A second parse of unchanged source is served from the on-disk result cache."""
+    file = tmp_path / "mod.py"
+    file.write_text("def foo(x: int) -> int:\n    return x\n")
+
+    first = python_parser.parse_python_file(str(file))
+    assert len(list(result_cache.CACHE_DIR.glob("*.json"))) == 1
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("ast.parse should not run on a cache hit")
+
+    monkeypatch.setattr(python_parser.ast, "parse", fail_parse)
+    python_parser.parse_python_file.cache_clear()
+    assert python_parser.parse_python_file(str(file)) == first
+
+def test_parser_ignores_damaged_cache_entries(tmp_path: Path):
+    """Empty or undecodable on-disk entries count as misses and are rewritten."""
+    file = tmp_path / "mod.py"
+    file.write_text("def foo():\n    pass\n")
+    python_parser.parse_python_file(str(file))
+    (entry,) = result_cache.CACHE_DIR.glob("*.json")
+
+    for damaged in (b"", b'{"functions": ['):
+        entry.write_bytes(damaged)
+        python_parser.parse_python_file.cache_clear()
+        assert python_parser.parse_python_file(str(file))["functions"]["name"] == ["foo"]
+        assert orjson.loads(entry.read_bytes())["functions"]["name"] == ["foo"]
+    assert not list(result_cache.CACHE_DIR.glob("*.tmp"))
+
+def test_result_cache_evicts_least_recently_used_entries(tmp_path: Path):
+    """Once the cache outgrows its limit, the entries used longest ago are evicted first."""
+    sources = [f"x = {i}\n".encode() for i in range(4)]
+    for i, source in enumerate(sources):
+        result_cache.store(source, b'{"n": %d}' % i)
+        entry = result_cache.CACHE_DIR / f"{result_cache.cache_key(source)}.json"
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+    # Reading an entry marks it as recently used.
+    assert result_cache.load(sources[0]) == b'{"n": 0}'
+
+    result_cache.prune(max_bytes=20)
+
+    assert result_cache.load(sources[0]) == b'{"n": 0}'
+    assert [result_cache.load(source) for source in sources[1:3]] == [None, None]
+    assert result_cache.load(sources[3]) == b'{"n": 3}'
+
+def test_parser_memoizes_unchanged_files(tmp_path: Path):
+    """Repeated parses hit the in-process cache and return independent copies."""
+    file = tmp_path / "mod.py"
+    file.write_text("def foo():\n    pass\n")
+
+    first = python_parser.parse_python_file(str(file))
+    first["functions"]["name"].clear()
+    second = python_parser.parse_python_file(str(file))
+    assert second["functions"]["name"] == ["foo"]
+    assert python_parser._parse_cached.cache_info().hits == 1
+
+    # A changed file gets a new (mtime, size) key and is parsed again.
+    file.write_text("def foo():\n    pass\n\ndef bar():\n    pass\n")
+    third = python_parser.parse_python_file(str(file))
+    assert third["functions"]["name"] == ["foo", "bar"]
+
+def test_parser_does_not_memoize_read_failures(tmp_path: Path, monkeypatch):
+    """A transient read error is reported but retried on the next request."""
+    file = tmp_path / "mod.py"
+    file.write_text("def foo():\n    pass\n")
+    read_file = _file_reader.read_file
+
+    def failing_read(path, size=None):
+        raise OSError(24, "Too many open files")
+
+    monkeypatch.setattr(_file_reader, "read_file", failing_read)
+    assert "Too many open files" in python_parser.parse_python_file(str(file))["error"]
+
+    monkeypatch.setattr(_file_reader, "read_file", read_file)
+    assert python_parser.parse_python_file(str(file))["functions"]["name"] == ["foo"]
+
+def test_parse_repo_skips_tooling_directories(tmp_path: Path):
+    """Caches, VCS metadata, build output, virtualenvs and hidden directories are not walked."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("def foo():\n    pass\n")
+    for skipped in ("__pycache__", ".git", ".venv", "venv", "node_modules", "build", "dist", ".hidden"):
+        (tmp_path / skipped).mkdir()
+        (tmp_path / skipped / "junk.py").write_text("def junk():\n    pass\n")
+
+    result = python_parser.parse_repo(str(tmp_path))
+
+    assert result["modules"] == ["pkg/mod.py"]
+    assert [f["name"] for f in result["functions"]] == ["foo"]
+
+def test_parse_repo_in_parallel(tmp_path: Path):
+    """Repos larger than one chunk are parsed by a process pool with the same result."""
+    count = python_parser._PARSE_CHUNKSIZE * 2 + 1
+    for i in range(count):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    helper_{i}()\n")
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+
+    result = python_parser.parse_repo(str(tmp_path))
+
+    assert len(result["modules"]) == count + 1
+    assert "broken.py" in result["modules"]
+    assert {f["name"] for f in result["functions"]} == {f"func_{i}" for i in range(count)}
+    assert {c["callee"] for c in result["calls"]} == {f"helper_{i}" for i in range(count)}
+
+def test_parse_repo_skips_files_deleted_after_the_walk(tmp_path: Path, monkeypatch):
+    """A file that disappears before it is read is left out; the other files still come back."""
+    count = python_parser._PARSE_CHUNKSIZE * 2
+    for i in range(count):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    pass\n")
+    iter_py_files = python_parser._iter_py_files
+
+    def walk_then_delete(root):
+        entries = list(iter_py_files(root))
+        for entry in entries:
+            entry.stat(follow_symlinks=False)
+        (tmp_path / "mod_0.py").unlink(missing_ok=True)
+        return iter(entries)
+
+    monkeypatch.setattr(python_parser, "_iter_py_files", walk_then_delete)
+    result = python_parser.parse_repo(str(tmp_path))
+    assert sorted(result["modules"]) == sorted(f"mod_{i}.py" for i in range(1, count))
+
+    (tmp_path / "mod_0.py").write_text("def func_0():\n    pass\n")
+    records = [orjson.loads(line) for line in b"".join(python_parser.iter_parse_repo(str(tmp_path))).splitlines()]
+    modules = {record["name"] for record in records if record["type"] == "module"}
+    assert modules == {f"mod_{i}.py" for i in range(1, count)}
+
+def test_parse_repo_order_is_deterministic(tmp_path: Path):
+    """parse_repo lists files in walk order, whether parsed in parallel or read from the index."""
+    for i in range(python_parser._PARSE_CHUNKSIZE * 3):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    pass\n")
+    walk_order = [entry.name for entry in python_parser._iter_py_files(str(tmp_path))]
+
+    first = python_parser.parse_repo(str(tmp_path))
+    for i in range(0, python_parser._PARSE_CHUNKSIZE * 3, 2):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    return 1\n")
+    second = python_parser.parse_repo(str(tmp_path))
+
+    assert first["modules"] == walk_order
+    assert second == first
+
+def test_parse_repo_reuses_worker_pool(tmp_path: Path):
+    """Every parallel parse_repo call shares one lazily created worker pool."""
+    for repo in ("a", "b"):
+        (tmp_path / repo).mkdir()
+        for i in range(python_parser._PARSE_CHUNKSIZE * 2):
+            (tmp_path / repo / f"mod_{i}.py").write_text(f"def func_{i}():\n    pass\n")
+
+    python_parser.parse_repo(str(tmp_path / "a"))
+    pool = python_parser._parse_pool
+    python_parser.parse_repo(str(tmp_path / "b"))
+
+    assert pool is not None
+    assert python_parser._parse_pool is pool
+
+def test_parse_pool_size_splits_cpus_between_server_workers(monkeypatch):
+    """Each server worker gets its share of the CPUs unless a pool size is configured."""
+    monkeypatch.setattr(python_parser.os, "cpu_count", lambda: 64)
+    monkeypatch.delenv("CODE_EXPLORER_PARSE_WORKERS", raising=False)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "64")
+    assert python_parser._parse_workers() == 1
+    monkeypatch.setenv("WEB_CONCURRENCY", "16")
+    assert python_parser._parse_workers() == 4
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    assert python_parser._parse_workers() == 8
+
+    monkeypatch.setenv("CODE_EXPLORER_PARSE_WORKERS", "3")
+    assert python_parser._parse_workers() == 3
+
+def test_read_file_with_stale_size_hint(tmp_path: Path):
+    """A size hint from an earlier stat never truncates or pads the contents."""
+    file = tmp_path / "mod.py"
+    file.write_bytes(b"x = 1\n" * 1000)
+
+    assert _file_reader.read_file(str(file), 6) == b"x = 1\n" * 1000
+    assert _file_reader.read_file(str(file), 60000) == b"x = 1\n" * 1000
+    assert _file_reader.read_file(str(file)) == b"x = 1\n" * 1000
+
+def test_read_many_reuses_reader_threads(tmp_path: Path):
+    """Batches share one lazily started set of reader threads."""
+    paths = []
+    for i in range(3):
+        (tmp_path / f"mod_{i}.py").write_text(f"x = {i}\n")
+        paths.append(str(tmp_path / f"mod_{i}.py"))
+
+    assert _file_reader.read_many(paths) == {path: f"x = {i}\n".encode() for i, path in enumerate(paths)}
+    pool = _file_reader._reader_pool
+    _file_reader.read_many(paths)
+
+    assert pool is not None
+    assert _file_reader._reader_pool is pool
+
+def test_read_file_handles_short_reads(tmp_path: Path, monkeypatch):
+    """A read returning fewer bytes than requested is not mistaken for end of file."""
+    file = tmp_path / "mod.py"
+    file.write_bytes(b"x = 1\n" * 1000)
+    real_read = os.read
+    monkeypatch.setattr(_file_reader.os, "read", lambda fd, n: real_read(fd, min(n, 100)))
+
+    assert _file_reader.read_file(str(file), 6000) == b"x = 1\n" * 1000
+
+def test_parser_handles_deeply_nested_expressions(tmp_path: Path):
+    """Expressions nested deeper than the Python stack allows for recursion still parse."""
+    file = tmp_path / "mod.py"
+    file.write_text("x = " + "+".join(["f(1)"] * 2000) + "\n")
+
+    result = python_parser.parse_python_file(str(file))
+
+    assert "error" not in result
+    assert len(result["relationships"]["function_calls"]) == 2000
+
+def test_parser_tolerates_deeply_nested_annotations(tmp_path: Path):
+    """An annotation too deep to unparse is reported as None instead of failing the file."""
+    file = tmp_path / "mod.py"
+    file.write_text("def foo() -> " + "+".join(["int"] * 2000) + ":\n    pass\n")
+
+    result = python_parser.parse_python_file(str(file))
+
+    assert result["functions"]["name"] == ["foo"]
+    assert result["functions"]["returns"] == [None]
+
+def test_parser_json_matches_dict_result():
+    """parse_python_file_json returns the same result, already serialized."""
+    file_path = "../examples/python_project/hello.py"
+    content = python_parser.parse_python_file_json(file_path)
+
+    assert isinstance(content, bytes)
+    assert orjson.loads(content) == python_parser.parse_python_file(file_path)
+    assert "File not found" in orjson.loads(python_parser.parse_python_file_json("nonexistent.py"))["error"]
+
+def test_iter_parse_repo_streams_ndjson(tmp_path: Path):
+    """The streaming variant yields one JSON record per module, function, and call."""
+    (tmp_path / "mod.py").write_text("def foo():\n    bar()\n")
+
+    records = [
+        orjson.loads(line)
+        for chunk in python_parser.iter_parse_repo(str(tmp_path))
+        for line in chunk.splitlines()
+    ]
+
+    assert records == [
+        {"type": "module", "name": "mod.py"},
+        {"type": "function", "name": "foo", "module": "mod.py", "lineno": 1},
+        {"type": "call", "callee": "bar"},
+    ]
+
+def test_parse_repo_reuses_index_for_unchanged_files(tmp_path: Path, monkeypatch):
+    """Only files whose content changed since the last run are parsed again."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    file = repo / "mod.py"
+    file.write_text("def foo():\n    pass\n")
+
+    first = python_parser.parse_repo(str(repo))
+
+    parsed = []
+    parse_one = python_parser._parse_one
+    monkeypatch.setattr(python_parser, "_parse_one", lambda path, source: parsed.append(path) or parse_one(path, source))
+
+    # Unchanged, then touched without a content change: served from the index.
+    assert python_parser.parse_repo(str(repo)) == first
+    os.utime(file, ns=(0, 0))
+    assert python_parser.parse_repo(str(repo)) == first
+    assert parsed == []
+
+    file.write_text("def bar():\n    pass\n")
+    result = python_parser.parse_repo(str(repo))
+    assert [f["name"] for f in result["functions"]] == ["bar"]
+    assert parsed == [str(file)]
+
+def test_iter_parse_repo_fetches_indexed_results_in_batches(tmp_path: Path, monkeypatch):
+    """A warm index hands out stored results a batch at a time, not the whole repo up front."""
+    for i in range(10):
+        (tmp_path / f"mod_{i}.py").write_text(f"def func_{i}():\n    pass\n")
+    cold = b"".join(python_parser.iter_parse_repo(str(tmp_path)))
+
+    fetched = []
+    load_results = repo_index.load_results
+    monkeypatch.setattr(repo_index, "load_results", lambda paths: fetched.append(len(paths)) or load_results(paths))
+    monkeypatch.setattr(python_parser, "_INDEX_BATCH", 4)
+    warm = python_parser.iter_parse_repo(str(tmp_path))
+
+    first = next(warm)
+    assert fetched == [4]
+    rest = b"".join(warm)
+    assert fetched == [4, 4, 2]
+    assert sorted((first + rest).splitlines()) == sorted(cold.splitlines())
+
+def test_parse_repo_prunes_deleted_files(tmp_path: Path):
+    """Index entries for files removed from a repo are dropped; other repos are untouched."""
+    repo = tmp_path / "repo"
+    other = tmp_path / "repo2"
+    for directory in (repo, other):
+        directory.mkdir()
+        (directory / "keep.py").write_text("def keep():\n    pass\n")
+        (directory / "gone.py").write_text("def gone():\n    pass\n")
+    python_parser.parse_repo(str(repo))
+    python_parser.parse_repo(str(other))
+
+    (repo / "gone.py").unlink()
+    python_parser.parse_repo(str(repo))
+
+    indexed = repo_index.lookup([str(d / name) for d in (repo, other) for name in ("keep.py", "gone.py")])
+    assert set(indexed) == {str(repo / "keep.py"), str(other / "keep.py"), str(other / "gone.py")}
+
+def test_repo_index_discards_other_versions(tmp_path: Path, monkeypatch):
+    """Entries written by another parser or interpreter version are not served."""
+    (tmp_path / "mod.py").write_text("def foo():\n    pass\n")
+    python_parser.parse_repo(str(tmp_path))
+    assert repo_index.lookup([str(tmp_path / "mod.py")])
+
+    monkeypatch.setattr(repo_index, "_INDEX_VERSION", repo_index._INDEX_VERSION + 1)
+    assert repo_index.lookup([str(tmp_path / "mod.py")]) == {}
+
+def test_parser_separates_methods_from_functions(tmp_path: Path):
+    """Only functions defined directly in a class body are methods; nested helpers stay functions."""
+    file = tmp_path / "mod.py"
+    file.write_text(
+        "def outer():\n"
+        "    def inner():\n"
+        "        pass\n"
+        "\n"
+        "class A:\n"
+        "    def method(self):\n"
+        "        def helper():\n"
+        "            pass\n"
+        "\n"
+        "    class B:\n"
+        "        def nested_method(self):\n"
+        "            pass\n"
+    )
+
+    result = python_parser.parse_python_file(str(file))
+
+    assert result["functions"]["name"] == ["outer", "inner", "helper"]
+    methods = {cls["name"]: cls["methods"]["name"] for cls in result["classes"]}
+    assert methods == {"A": ["method"], "B": ["nested_method"]}
+
+def test_parser_counts_code_lines(tmp_path: Path):
+    """Blank and comment-only lines (however indented) are excluded from code_lines."""
+    file = tmp_path / "mod.py"
+    file.write_bytes(b"# header\r\n\r\nx = 1  # trailing\r\n    # indented\r\n\t\r\ndef f():\r\n    return x\r\n")
+
+    metrics = python_parser.parse_python_file(str(file))["metrics"]
+
+    assert metrics["total_lines"] == 8
+    assert metrics["code_lines"] == 3
+
+def test_parser_renders_class_bases(tmp_path: Path):
+    """Dotted and subscripted base classes are reported in full."""
+    file = tmp_path / "mod.py"
+    file.write_text(
+        "import collections.abc\n"
+        "import typing\n"
+        "\n"
+        "class A(Base, collections.abc.Mapping, typing.Generic[T]):\n"
+        "    pass\n"
+    )
+
+    result = python_parser.parse_python_file(str(file))
+
+    assert result["classes"][0]["bases"] == ["Base", "collections.abc.Mapping", "typing.Generic[T]"]
@@ -15,6 +15,15 @@ export interface ParsedClass {
   methods: ParsedFunction[];
 }
 
+// The backend sends function lists column-wise (one array per field, index i
+// describing the same function) to keep payloads small.
+export interface FunctionColumns {
+  name: string[];
+  args: string[][];
+  returns: (string | null)[];
+  docstring: (string | null)[];
+}
+
 export interface ImportInfo {
   name?: string;
   module?: string;
@@ -61,6 +70,24 @@ export interface ErrorResult {
 
 export type ApiResponse = ParseResult | ErrorResult;
 
+type RawParsedClass = Omit<ParsedClass, "methods"> & {
+  methods: FunctionColumns;
+};
+
+type RawParseResult = Omit<ParseResult, "functions" | "classes"> & {
+  functions: FunctionColumns;
+  classes: RawParsedClass[];
+};
+
+function fromColumns(columns: FunctionColumns): ParsedFunction[] {
+  return columns.name.map((name, i) => ({
+    name,
+    args: columns.args[i],
+    returns: columns.returns[i],
+    docstring: columns.docstring[i],
+  }));
+}
+
 export async function parsePythonFile(filePath: string): Promise<ApiResponse> {
   try {
     const response = await fetch(
@@ -71,8 +98,18 @@ export async function parsePythonFile(filePath: string): Promise<ApiResponse> {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
-    return data;
+    const data: RawParseResult | ErrorResult = await response.json();
+    if ("error" in data) {
+      return data;
+    }
+    return {
+      ...data,
+      functions: fromColumns(data.functions),
+      classes: data.classes.map((cls) => ({
+        ...cls,
+        methods: fromColumns(cls.methods),
+      })),
+    };
   } catch (error) {
     console.error("Error parsing file:", error);
     return { error: error instanceof Error ? error.message : "Unknown error" };